@@ -0,0 +1,40 @@
+"""
+Bulk loading helpers for the MIMIC / FAERS / Barkla tables
+
+Both helpers run on the session's connection, so they join its transaction; the caller commits.
+"""
+
+import csv
+import io
+from typing import Iterable, List, Sequence
+
+from psycopg2 import sql
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+# Written for None so NULLs stay distinct from empty strings in the CSV stream
+_NULL = "\\N"
+
+
+# Load rows into a model's table with COPY FROM STDIN; fastest path for large ingests
+def bulk_copy(db: Session, model, rows: Iterable[Sequence], columns: Sequence[str]) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_NULL if value is None else value for value in row])
+    buffer.seek(0)
+
+    table = model.__table__
+    statement = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL {})").format(
+        sql.Identifier(table.schema, table.name) if table.schema else sql.Identifier(table.name),
+        sql.SQL(", ").join(sql.Identifier(column) for column in columns),
+        sql.Literal(_NULL),
+    )
+    with db.connection().connection.cursor() as cursor:
+        cursor.copy_expert(statement, buffer)
+
+
+# Insert a list of column dicts with SQLAlchemy 2.x executemany ("insertmanyvalues" batching)
+def bulk_insert(db: Session, model, rows: List[dict]) -> None:
+    if rows:
+        db.execute(insert(model), rows)
@@ -0,0 +1,168 @@
+"""
+Caches for static reference data and query results
+
+The reference tables are loaded outside the app and do not change while it runs.
+bnf_drug_classes and the PT -> HLGT mapping are small enough to be read into dicts at startup
+(load_reference_tables); sider_drug_indications lookups are memoised per drug for the lifetime
+of the process. Cached values are shared between requests and must not be mutated by callers.
+
+Serialized JSON responses of the DDI and side effect endpoints are kept in a dogpile.cache
+region backed by Redis (REDIS_HOST). Without Redis configured the region does not cache; if
+Redis is unreachable, call_cached serves the response straight from Postgres.
+The distinct name lists (/drug_names etc.) are kept per process in names_region, already
+encoded as JSON.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+import orjson
+from dogpile.cache import make_region
+from dogpile.cache.util import sha1_mangle_key
+from redis.exceptions import RedisError
+from sqlalchemy import cast, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.db.models import DrugClass, SiderDrugIndications, DDIEnriched, SingleDrugPositiveControls, PTtoHLTMapping
+from app.db.schemas import DDIResponse, SideEffectResponse
+from app.db.session import Config, SessionLocal
+
+if Config.REDIS_HOST:
+    region = make_region(key_mangler=sha1_mangle_key).configure(
+        "dogpile.cache.redis",
+        expiration_time=Config.CACHE_EXPIRATION,
+        arguments={
+            "host": Config.REDIS_HOST,
+            "port": Config.REDIS_PORT,
+            "redis_expiration_time": Config.CACHE_EXPIRATION * 2,
+            "distributed_lock": True,
+            "thread_local_lock": False,  # Required by dogpile with distributed_lock
+            "socket_timeout": Config.REDIS_SOCKET_TIMEOUT,  # A slow Redis falls back like a down one
+        },
+    )
+else:
+    region = make_region().configure("dogpile.cache.null")
+
+logger = logging.getLogger(__name__)
+
+# Process-local; the name lists are small and only change when the tables are reloaded
+names_region = make_region().configure("dogpile.cache.memory", expiration_time=Config.CACHE_EXPIRATION)
+
+# Columns selected for DDI / side effect responses, read as plain row mappings (no ORM hydration)
+DDI_RESPONSE_COLUMNS = [getattr(DDIEnriched, field) for field in DDIResponse.model_fields]
+SIDE_EFFECT_RESPONSE_COLUMNS = [getattr(SingleDrugPositiveControls, field) for field in SideEffectResponse.model_fields]
+
+
+# Lower-cased drug name -> {"drug_name", "bnf_order", "title"}
+DRUG_CLASS_MAP: Dict[str, dict] = {}
+# MedDRA PT -> its HLGT ancestors joined with '/'
+PT_TO_HLGT_MAP: Dict[str, str] = {}
+
+
+# Read the static reference tables into memory; called once at startup
+def load_reference_tables() -> None:
+    global DRUG_CLASS_MAP, PT_TO_HLGT_MAP
+
+    with SessionLocal() as db:
+        drug_classes = {}
+        for drug_class in db.query(DrugClass.drug_name, DrugClass.bnf_order, DrugClass.title).order_by(DrugClass.drug_name):
+            drug_classes.setdefault(drug_class.drug_name.lower(), dict(drug_class._mapping))
+
+        ancestors = defaultdict(set)
+        for pt, hlgt in db.query(PTtoHLTMapping.descendant_concept_name, PTtoHLTMapping.ancestor_concept_name).filter(
+            PTtoHLTMapping.ancestor_concept_class_id == 'HLGT'
+        ):
+            ancestors[pt].add(hlgt)
+
+    # Rebind rather than mutate so concurrent readers never see a half-built map
+    DRUG_CLASS_MAP = drug_classes
+    PT_TO_HLGT_MAP = {pt: '/'.join(sorted(hlgts)) for pt, hlgts in ancestors.items()}
+
+
+# BNF drug class for a single drug (case-insensitive), or None if the drug has no class
+def get_drug_class(drug_name: str) -> Optional[dict]:
+    return DRUG_CLASS_MAP.get(drug_name.lower())
+
+
+# HLGT ancestors for the PTs that have any, as {pt: "hlgt_1/hlgt_2"}
+def get_hlgt_ancestors(pt_list: Iterable[str]) -> Dict[str, str]:
+    return {pt: PT_TO_HLGT_MAP[pt] for pt in pt_list if pt in PT_TO_HLGT_MAP}
+
+
+# Requested drug name -> its SIDER indications. Only drugs that have indications are kept, so the
+# size is bounded by sider_drug_indications rather than by the names clients ask for.
+DRUG_INDICATIONS: Dict[str, Tuple[dict, ...]] = {}
+
+
+# SIDER indications for each drug, excluding 'Sudden death', as {drug name: indications} keyed by the
+# names as given. Drugs not cached yet are fetched together in one query; each row comes back tagged
+# with the requested name it matched, so matching follows the column's own comparison in Postgres.
+def get_drugs_indications(drug_names: Iterable[str]) -> Dict[str, Tuple[dict, ...]]:
+    requested = dict.fromkeys(drug_names)
+    missing = [drug_name for drug_name in requested if drug_name not in DRUG_INDICATIONS]
+    if missing:
+        requested_name = func.unnest(
+            cast(missing, ARRAY(SiderDrugIndications.drug_concept_name.type))
+        ).column_valued("requested_name")
+        with SessionLocal() as db:
+            indications = db.execute(select(requested_name, *SiderDrugIndications.__table__.c).where(
+                SiderDrugIndications.drug_concept_name == requested_name,
+                SiderDrugIndications.event_concept_name != 'Sudden death'
+            )).mappings().all()
+        fetched = defaultdict(list)
+        for indication in indications:
+            indication = dict(indication)
+            fetched[indication.pop("requested_name")].append(indication)
+        DRUG_INDICATIONS.update((drug_name, tuple(rows)) for drug_name, rows in fetched.items())
+    return {drug_name: DRUG_INDICATIONS.get(drug_name, ()) for drug_name in requested}
+
+
+# SIDER indications for a single drug, excluding 'Sudden death'
+def get_drug_indications(drug_name: str) -> Tuple[dict, ...]:
+    return get_drugs_indications([drug_name])[drug_name]
+
+
+# Interactions between any two of the given drugs
+def select_interactions(drug_names: Iterable[str]):
+    return select(*DDI_RESPONSE_COLUMNS).where(
+        DDIEnriched.drug_a_concept_name.in_(drug_names),
+        DDIEnriched.drug_b_concept_name.in_(drug_names)
+    )
+
+
+# JSON body for /interactions; callers pass a lower-cased, sorted, de-duplicated drug tuple as the cache key
+@region.cache_on_arguments()
+def get_interactions_json(drug_names: Tuple[str, ...]) -> bytes:
+    with SessionLocal() as db:
+        interactions = db.execute(select_interactions(drug_names)).mappings().all()
+        return orjson.dumps([dict(interaction) for interaction in interactions])
+
+
+# JSON body for /side_effects; callers pass a lower-cased, sorted, de-duplicated drug tuple as the cache key
+@region.cache_on_arguments()
+def get_side_effects_json(drug_names: Tuple[str, ...]) -> bytes:
+    with SessionLocal() as db:
+        side_effects = db.execute(select(*SIDE_EFFECT_RESPONSE_COLUMNS).where(
+            SingleDrugPositiveControls.drug_concept_name.in_(drug_names),
+            SingleDrugPositiveControls.source == 'BNF',
+            SingleDrugPositiveControls.frequency != 'Not reported (Interaction Effect)'
+        )).mappings().all()
+        return orjson.dumps([dict(side_effect) for side_effect in side_effects])
+
+
+# Call a region.cache_on_arguments() function; if the cache backend fails, log it and call the
+# undecorated function instead so a cache outage does not fail the request
+def call_cached(cached_function, *args):
+    try:
+        return cached_function(*args)
+    except RedisError as e:
+        logger.warning(f"Cache unavailable for {cached_function.__name__}, querying directly: {e}")
+        return cached_function.original(*args)
+
+
+# Drop cached names, indications and (in this process) cached responses after a data reload
+def invalidate_caches() -> None:
+    names_region.invalidate()
+    region.invalidate()
+    DRUG_INDICATIONS.clear()
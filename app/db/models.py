@@ -1,15 +1,26 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, Boolean
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, Computed, Integer, BigInteger, String, Text, ForeignKey, Float, Boolean, Date, DateTime, Index, cast, text
+from sqlalchemy.dialects.postgresql import CITEXT
+from sqlalchemy.orm import DeclarativeBase
 
-Base = declarative_base()
+# Base class for SQLAlchemy models
+class Base(DeclarativeBase):
+    pass
 
 class AllDrugDrugInteractions(Base):
     __tablename__ = "all_drug_drug_interactions"
-    __table_args__ = {"schema": "drug_interaction_compendia_v2"}
+    __table_args__ = (
+        Index("ix_ddi_drug_pair", "drug_a_concept_name", "drug_b_concept_name"),
+        Index("ix_ddi_drug_b_a", "drug_b_concept_name", "drug_a_concept_name"),
+        Index("ix_ddi_drug_pair_lo_hi", "drug_pair_lo", "drug_pair_hi"),
+        {"schema": "drug_interaction_compendia_v2"},
+    )
 
     id = Column(Integer, primary_key=True)
-    drug_a_concept_name = Column(String)
-    drug_b_concept_name = Column(String)
+    drug_a_concept_name = Column(CITEXT)
+    drug_b_concept_name = Column(CITEXT)
+    # Order-independent pair (migrations/007_ddi_drug_pair_columns.sql)
+    drug_pair_lo = Column(CITEXT, Computed("LEAST(drug_a_concept_name, drug_b_concept_name)"))
+    drug_pair_hi = Column(CITEXT, Computed("GREATEST(drug_a_concept_name, drug_b_concept_name)"))
     event_concept_name = Column(String)
     drug_a_concept_id = Column(String)
     drug_b_concept_id = Column(String)
@@ -25,10 +36,13 @@ class AllDrugDrugInteractions(Base):
 
 class SingleDrugPositiveControls(Base):
     __tablename__ = "single_drug_positive_controls"
-    __table_args__ = {"schema": "drug_interaction_compendia_v2"}
+    __table_args__ = (
+        Index("ix_sdpc_source_drug", "source", "drug_concept_name"),
+        {"schema": "drug_interaction_compendia_v2"},
+    )
 
     id = Column(Integer, primary_key=True)
-    drug_concept_name = Column(String)
+    drug_concept_name = Column(CITEXT)
     event_concept_name = Column(String)
     drug_concept_id = Column(String)
     event_concept_id = Column(String)
@@ -40,19 +54,26 @@ class SingleDrugPositiveControls(Base):
 
 class SiderDrugIndications(Base):
     __tablename__ = "sider_drug_indications"
-    __table_args__ = {"schema": "drug_interaction_compendia_v2"}
+    __table_args__ = (
+        Index("ix_sider_drug", "drug_concept_name", postgresql_where=text("event_concept_name <> 'Sudden death'")),
+        Index("ix_sider_event_drug", "event_concept_name", "drug_concept_name", postgresql_where=text("event_concept_name <> 'Sudden death'")),
+        {"schema": "drug_interaction_compendia_v2"},
+    )
 
     id = Column(Integer, primary_key=True)
     drug_concept_id = Column(String)
     event_concept_id = Column(String)
-    drug_concept_name = Column(String)
+    drug_concept_name = Column(CITEXT)
     event_concept_name = Column(String) 
     drug_vocabulary_id = Column(String)
     event_vocabulary_id = Column(String)
 
 class PTtoHLTMapping(Base):
     __tablename__ = "pt_to_hlt_or_hlgt"
-    __table_args__ = {"schema": "cdmv5"}
+    __table_args__ = (
+        Index("ix_pt_descendant", "descendant_concept_name", postgresql_include=["ancestor_concept_name", "ancestor_concept_class_id"]),
+        {"schema": "cdmv5"},
+    )
 
     id = Column(Integer, primary_key=True)
     descendant_concept_name = Column(String)
@@ -61,11 +82,14 @@ class PTtoHLTMapping(Base):
 
 class BarklaData(Base):
     __tablename__ = "barkla_weighted_rate"
-    __table_args__ = {"schema": "drug_interaction_compendia_v2"}
+    __table_args__ = (
+        Index("ix_barkla_drug_se", "drug_name", "side_effect"),
+        {"schema": "drug_interaction_compendia_v2"},
+    )
 
     id = Column(Integer, primary_key=True)
-    side_effect = Column(String)
-    drug_name = Column(String)
+    side_effect = Column(CITEXT)
+    drug_name = Column(CITEXT)
     count = Column(Integer)
     unsurprising_background_rate = Column(Float)
     surprising_background_rate = Column(Float)
@@ -76,11 +100,14 @@ class BarklaData(Base):
 
 class FAERSData(Base):
     __tablename__ = "faers_counts_2024"
-    __table_args__ = {"schema": "drug_interaction_compendia_v2"}
+    __table_args__ = (
+        Index("ix_faers_drug_se", "drug_name", "side_effect"),
+        {"schema": "drug_interaction_compendia_v2"},
+    )
 
     id = Column(Integer, primary_key=True)
-    drug_name = Column(String)
-    side_effect = Column(String)
+    drug_name = Column(CITEXT)
+    side_effect = Column(CITEXT)
     drug_side_effect_occurrence_count = Column(Integer)
     case_count_with_drug = Column(Integer)
     rate = Column(Float)
@@ -91,10 +118,20 @@ class DrugClass(Base):
     __tablename__ = "bnf_drug_classes"
     __table_args__ = {"schema": "drug_interaction_compendia_v2"}
 
-    drug_name = Column(String, primary_key=True)
+    drug_name = Column(String, primary_key=True) # Not citext; may hold case variants (see migrations/005)
     bnf_order = Column(String)
     title = Column(String)
 
+# Trigram indexes for fuzzy drug name search (migrations/006_trigram_drug_names.sql).
+# gin_trgm_ops does not accept citext, so they index the ::text cast of each name column.
+def _trigram_index(name, column):
+    return Index(name, cast(column, Text).label(column.key), postgresql_using="gin", postgresql_ops={column.key: "gin_trgm_ops"})
+
+_trigram_index("ix_ddi_drug_a_trgm", AllDrugDrugInteractions.drug_a_concept_name)
+_trigram_index("ix_ddi_drug_b_trgm", AllDrugDrugInteractions.drug_b_concept_name)
+_trigram_index("ix_barkla_drug_trgm", BarklaData.drug_name)
+_trigram_index("ix_drug_class_trgm", DrugClass.drug_name)
+
 class Patient(Base):
     __tablename__ = "patients"
     __table_args__ = {"schema": "mimic_iii_clinical_database_1_4"}
@@ -102,29 +139,32 @@ class Patient(Base):
     ROW_ID = Column(Integer)
     SUBJECT_ID = Column(Integer, primary_key=True)
     GENDER = Column(String)
-    DOB = Column(String)
-    DOD = Column(String)
-    DOD_HOSP = Column(String)
-    DOD_SSN = Column(String)
+    DOB = Column(Date)
+    DOD = Column(Date)
+    DOD_HOSP = Column(Date)
+    DOD_SSN = Column(Date)
     EXPIRE_FLAG = Column(Integer)
 
 class Prescription(Base):
     __tablename__ = "prescriptions"
-    __table_args__ = {"schema": "mimic_iii_clinical_database_1_4"}
+    __table_args__ = (
+        Index("ix_presc_subject", "SUBJECT_ID"),
+        {"schema": "mimic_iii_clinical_database_1_4"},
+    )
 
     ROW_ID = Column(Integer, primary_key=True)
     SUBJECT_ID = Column(Integer)
     HADM_ID = Column(Integer)
     ICUSTAY_ID = Column(Integer)
-    STARTDATE = Column(String)
-    ENDDATE = Column(String)
+    STARTDATE = Column(Date)
+    ENDDATE = Column(Date)
     DRUG_TYPE = Column(String)
     DRUG = Column(String)
     DRUG_NAME_POE = Column(String)
     DRUG_NAME_GENERIC = Column(String)
     FORMULARY_DRUG_CD = Column(String)
     GSN = Column(String)
-    NDC = Column(Float)
+    NDC = Column(BigInteger)
     PROD_STRENGTH = Column(String)
     DOSE_VAL_RX = Column(String)
     DOSE_UNIT_RX = Column(String)
@@ -134,7 +174,10 @@ class Prescription(Base):
     
 class Diagnosis(Base):
     __tablename__ = "diagnoses"
-    __table_args__ = {"schema": "mimic_iii_clinical_database_1_4"}
+    __table_args__ = (
+        Index("ix_diag_subject", "SUBJECT_ID"),
+        {"schema": "mimic_iii_clinical_database_1_4"},
+    )
 
     ROW_ID = Column(Integer, primary_key=True)
     SUBJECT_ID = Column(Integer)
@@ -159,9 +202,9 @@ class Admission(Base):
     ROW_ID = Column(Integer)
     SUBJECT_ID = Column(Integer)
     HADM_ID = Column(Integer, primary_key=True)
-    ADMITTIME = Column(String)
-    DISCHTIME = Column(String)
-    DEATHTIME = Column(String)
+    ADMITTIME = Column(DateTime)
+    DISCHTIME = Column(DateTime)
+    DEATHTIME = Column(DateTime)
     ADMISSION_TYPE = Column(String)
     ADMISSION_LOCATION = Column(String)
     DISCHARGE_LOCATION = Column(String)
@@ -170,8 +213,58 @@ class Admission(Base):
     RELIGION = Column(String)
     MARITAL_STATUS = Column(String)
     ETHNICITY = Column(String)
-    EDREGTIME = Column(String)
-    EDOUTTIME = Column(String)
+    EDREGTIME = Column(DateTime)
+    EDOUTTIME = Column(DateTime)
     DIAGNOSIS = Column(String)
     HOSPITAL_EXPIRE_FLAG = Column(Integer)
-    HAS_CHARTEVENTS_DATA = Column(Integer)
\ No newline at end of file
+    HAS_CHARTEVENTS_DATA = Column(Integer)
+
+# Read-only: materialized view of patients LEFT JOIN prescriptions (migrations/002_patient_portfolio_mv.sql)
+class PatientPortfolioMV(Base):
+    __tablename__ = "patient_portfolio_mv"
+    __table_args__ = {"schema": "drug_interaction_compendia_v2"}
+
+    SUBJECT_ID = Column(Integer, primary_key=True)
+    GENDER = Column(String)
+    DOB = Column(Date)
+    ROW_ID = Column(Integer, primary_key=True) # NULL for patients without prescriptions
+    STARTDATE = Column(Date)
+    ENDDATE = Column(Date)
+    DRUG = Column(String)
+    DRUG_NAME_GENERIC = Column(String)
+    FORMULARY_DRUG_CD = Column(String)
+    DOSE_VAL_RX = Column(String)
+    DOSE_UNIT_RX = Column(String)
+    ROUTE = Column(String)
+
+# Read-only: materialized view of all_drug_drug_interactions enriched with drug classes and event HLGTs
+# (migrations/003_ddi_enriched_mv.sql)
+class DDIEnriched(Base):
+    __tablename__ = "ddi_enriched_mv"
+    __table_args__ = (
+        Index("ix_ddi_enriched_drug_pair", "drug_a_concept_name", "drug_b_concept_name"),
+        Index("ix_ddi_enriched_drug_b_a", "drug_b_concept_name", "drug_a_concept_name"),
+        Index("ix_ddi_enriched_drug_pair_lo_hi", "drug_pair_lo", "drug_pair_hi"),
+        {"schema": "drug_interaction_compendia_v2"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    drug_a_concept_name = Column(CITEXT)
+    drug_b_concept_name = Column(CITEXT)
+    drug_pair_lo = Column(CITEXT)
+    drug_pair_hi = Column(CITEXT)
+    event_concept_name = Column(String)
+    drug_a_concept_id = Column(String)
+    drug_b_concept_id = Column(String)
+    event_concept_id = Column(String)
+    drug_a_vocabulary_id = Column(String)
+    drug_b_vocabulary_id = Column(String)
+    severity_bnf = Column(String)
+    severity_ansm = Column(String)
+    severity_code = Column(Integer)
+    evidence = Column(String)
+    event_type = Column(String)
+    description = Column(String)
+    drug_a_class = Column(String)
+    drug_b_class = Column(String)
+    event_hlgt = Column(String)
@@ -1,8 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
+from datetime import date, datetime
 
-# Response from all_drug_drug_interactions table
+# Response from all_drug_drug_interactions table (via ddi_enriched_mv)
 class DDIResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     # id: int
     drug_a_concept_name: str
     drug_b_concept_name: str
@@ -12,8 +15,13 @@ class DDIResponse(BaseModel):
     severity_code: int
     evidence: Optional[str]
     description: str
+    drug_a_class: Optional[str] = None
+    drug_b_class: Optional[str] = None
+    event_hlgt: Optional[str] = None
 
 class SideEffectResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     # id: int
     drug_concept_name: str
     event_concept_name: Optional[str]
@@ -25,21 +33,29 @@ class SideEffectResponse(BaseModel):
     source: Optional[str]
 
 class IndicationResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     drug_concept_name: Optional[str]
     event_concept_name: Optional[str]
 
 class AlternativeSearchResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     drug_concept_name: Optional[str]
     event_concept_name: Optional[str]
 
 class DrugClassResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     drug_name: str
     bnf_order: Optional[str]
     title: Optional[str]
 
 class PrescriptionResponse(BaseModel):
-    start_date: str
-    end_date: str
+    model_config = ConfigDict(from_attributes=True)
+
+    start_date: Optional[date]
+    end_date: Optional[date]
     drug: str
     drug_name_generic: str
     formulary_drug_cd: str
@@ -48,20 +64,26 @@ class PrescriptionResponse(BaseModel):
     route: str
 
 class PatientPortfolioResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     patient_id: int
     patient_gender: str
     patient_age: int
-    patient_dob: str
+    patient_dob: date
     prescriptions: List[PrescriptionResponse]
 
 class DiagnosisResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     icd9_code: str
     short_title: str
     long_title: str
     hadm_ids: List[int]
 
 class AdmissionResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     hadm_id: int
-    admission_time: str
-    discharge_time: str
+    admission_time: Optional[datetime]
+    discharge_time: Optional[datetime]
     diagnosis: str
\ No newline at end of file
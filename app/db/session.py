@@ -1,7 +1,7 @@
 # Claude. 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import QueuePool
 
 import os
 import dotenv
@@ -15,18 +15,41 @@ class Config:
     DB_PORT = os.getenv("DB_PORT")
     DB_NAME = os.getenv("DB_NAME")
     DB_SCHEMA = os.getenv("DB_SCHEMA")
-
-# Base class for SQLAlchemy models
-Base = declarative_base()
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 20))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 40))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 10))
+    DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 5))
+    DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", 1200))
+    REDIS_HOST = os.getenv("REDIS_HOST")
+    REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+    REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 0.5))
+    CACHE_EXPIRATION = int(os.getenv("CACHE_EXPIRATION", 3600))
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+    STREAM_MIN_DRUGS = int(os.getenv("STREAM_MIN_DRUGS", 50))
 
 # SQLAlchemy engine
 engine = create_engine(
     f"postgresql://{Config.DB_USER}:{Config.DB_PASSWORD}@{Config.DB_HOST}:{Config.DB_PORT}/{Config.DB_NAME}",
-    pool_pre_ping=True # Ensures the connection is alive
+    poolclass=QueuePool,
+    pool_size=Config.DB_POOL_SIZE,
+    max_overflow=Config.DB_MAX_OVERFLOW,
+    pool_recycle=1800, # Replace connections older than 30 minutes
+    pool_timeout=Config.DB_POOL_TIMEOUT, # Fail fast instead of queueing forever on an exhausted pool
+    pool_use_lifo=True, # Reuse the most recently returned (warm) connection first
+    pool_pre_ping=True, # Ensures the connection is alive
+    query_cache_size=Config.DB_QUERY_CACHE_SIZE # Compiled SQL cache; the default (500) is tight for our endpoints' statement variants
 )
 
-# Configured "SessionLocal" class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Open connections up front (called at startup) so the first requests don't pay connection setup.
+# They are held together so the pool creates `size` distinct connections, then all returned to it.
+def warm_pool(size: int) -> None:
+    connections = [engine.connect() for _ in range(min(size, Config.DB_POOL_SIZE))]
+    for connection in connections:
+        connection.close()
+
+# Configured "SessionLocal" class. autoflush is off (handlers are read-only) and objects are not
+# expired on commit, so they stay readable after a commit without another round trip.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Dependency for FastAPI routes
 def get_db():
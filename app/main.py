@@ -1,9 +1,33 @@
+from contextlib import asynccontextmanager
+
+import anyio.to_thread
 from fastapi import FastAPI
-from app.routes.routes import router
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from app.db.cache import load_reference_tables
+from app.db.session import Config, warm_pool
+from app.routes.routes import admin_router, router
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync route handlers run on AnyIO worker threads (40 by default). Allow at least as many
+    # threads as the DB pool can hand out connections, so requests queue on the pool
+    # (bounded by pool_timeout) rather than on a thread.
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = max(limiter.total_tokens, Config.DB_POOL_SIZE + Config.DB_MAX_OVERFLOW)
+    # Establish the pool's baseline connections before taking traffic
+    await anyio.to_thread.run_sync(warm_pool, Config.DB_POOL_MIN_SIZE)
+    # Static reference tables (drug classes, PT -> HLGT) are served from memory
+    await anyio.to_thread.run_sync(load_reference_tables)
+    yield
+
+app = FastAPI(title="Drug-Drug Interaction API", default_response_class=ORJSONResponse, lifespan=lifespan)
 
-app = FastAPI(title="Drug-Drug Interaction API")
+# DDI / side effect JSON is large and repetitive; compress anything over 1 KB
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 app.include_router(router, tags=["Main"])
+app.include_router(admin_router, tags=["Admin"])
 
 @app.get("/")
 async def root():
@@ -4,18 +4,22 @@ Routes for the API
 NOTE: get_drug_names must include single drug names. omitted for development purposes.
 """
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
 from sqlalchemy.orm import Session
-from app.db.models import AllDrugDrugInteractions, SingleDrugPositiveControls, SiderDrugIndications, PTtoHLTMapping, BarklaData, FAERSData, DrugClass, Patient, Prescription, Diagnosis, D_Icd, Admission
-import pandas as pd
-
-from app.db.session import SessionLocal
-from app.db.schemas import DDIResponse, SideEffectResponse, IndicationResponse, AlternativeSearchResponse, DrugClassResponse, PatientPortfolioResponse, PrescriptionResponse, DiagnosisResponse, AdmissionResponse
+from app.db.models import AllDrugDrugInteractions, SingleDrugPositiveControls, SiderDrugIndications, BarklaData, FAERSData, DrugClass, Patient, Diagnosis, D_Icd, Admission, PatientPortfolioMV, DDIEnriched
+import orjson
+import hashlib
+import hmac
+
+from app.db.session import Config, SessionLocal, get_db
+from app.db.cache import names_region, call_cached, invalidate_caches, load_reference_tables, get_drug_class, get_drug_indications, get_drugs_indications, get_hlgt_ancestors, get_interactions_json, get_side_effects_json, select_interactions, DDI_RESPONSE_COLUMNS
+from app.db.schemas import DDIResponse, SideEffectResponse, IndicationResponse, AlternativeSearchResponse, DrugClassResponse, PatientPortfolioResponse, DiagnosisResponse, AdmissionResponse
 from fastapi import HTTPException
-from typing import List, Dict
-from sqlalchemy import func
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import List, Dict, Literal, Optional, Tuple
+from sqlalchemy import Integer, Text, bindparam, cast, func, lambda_stmt, select, tuple_, union
+from sqlalchemy.dialects.postgresql import ARRAY, CITEXT, aggregate_order_by
 import logging
-from datetime import datetime
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,13 +27,11 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Select `expression` over all rows as one JSON array built by Postgres (json_agg), optionally ordered.
+# The text cast keeps psycopg2 from parsing it, so the result is sent without any per-row work in Python.
+def select_json_array(expression, *order_by):
+    aggregated = func.json_agg(aggregate_order_by(expression, *order_by) if order_by else expression)
+    return select(func.coalesce(cast(aggregated, Text), "[]"))
 
 # Get the set of drug names
 @router.get("/drug_names", 
@@ -38,14 +40,15 @@ def get_db():
     response_description="A list of drug names as strings.")
 def get_drug_names(db: Session = Depends(get_db)):
     try:
-        drug_a_names = [name[0] for name in db.query(AllDrugDrugInteractions.drug_a_concept_name).distinct().all()]
-        drug_b_names = [name[0] for name in db.query(AllDrugDrugInteractions.drug_b_concept_name).distinct().all()]
-        single_drug_names = [name[0] for name in db.query(SingleDrugPositiveControls.drug_concept_name).distinct().all()]
-        all_drug_names = set(drug_a_names + drug_b_names) # + single_drug_names)
-        all_drug_names.discard(None)
+        # One round trip: UNION de-duplicates drug_a and drug_b names in the database
+        drug_names = union(
+            select(AllDrugDrugInteractions.drug_a_concept_name.label("name")).where(AllDrugDrugInteractions.drug_a_concept_name.isnot(None)),
+            select(AllDrugDrugInteractions.drug_b_concept_name).where(AllDrugDrugInteractions.drug_b_concept_name.isnot(None))
+        ).subquery()
+        content = names_region.get_or_create("drug_names", lambda: db.execute(select_json_array(drug_names.c.name)).scalar_one())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    return list(all_drug_names)
+    return Response(content=content, media_type="application/json")
 
 # Get the set of drug names
 @router.get("/barkla_drug_names", 
@@ -54,12 +57,12 @@ def get_drug_names(db: Session = Depends(get_db)):
     response_description="A list of drug names as strings.")
 def get_drug_names(db: Session = Depends(get_db)):
     try:
-        drug_names = [name[0] for name in db.query(BarklaData.drug_name).distinct().all()]
-        drug_names = set(drug_names)
-        drug_names.discard(None)
+        content = names_region.get_or_create("barkla_drug_names", lambda: orjson.dumps(db.execute(
+            select(BarklaData.drug_name).where(BarklaData.drug_name.isnot(None)).distinct()
+        ).scalars().all()))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    return list(drug_names)
+    return Response(content=content, media_type="application/json")
 
 # Get the set of FAERS drug names
 @router.get("/faers_drug_names", 
@@ -68,12 +71,52 @@ def get_drug_names(db: Session = Depends(get_db)):
     response_description="A list of drug names as strings.")
 def get_faers_drug_names(db: Session = Depends(get_db)):
     try:
-        drug_names = [name[0] for name in db.query(FAERSData.drug_name).distinct().all()]
-        drug_names = set(drug_names)
-        drug_names.discard(None)
+        content = names_region.get_or_create("faers_drug_names", lambda: orjson.dumps(db.execute(
+            select(FAERSData.drug_name).where(FAERSData.drug_name.isnot(None)).distinct()
+        ).scalars().all()))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    return list(drug_names)
+    return Response(content=content, media_type="application/json")
+
+# Drug name columns searchable by /drug_name_search, per data source
+DRUG_NAME_SEARCH_COLUMNS = {
+    "ddi": [AllDrugDrugInteractions.drug_a_concept_name, AllDrugDrugInteractions.drug_b_concept_name],
+    "barkla": [BarklaData.drug_name],
+    "bnf": [DrugClass.drug_name],
+}
+
+# Fuzzy drug name search for autocomplete
+@router.get("/drug_name_search",
+    response_model=List[str],
+    summary="Get drug names similar to a (possibly misspelt or partial) query",
+    response_description="A list of drug names, most similar first.")
+def search_drug_names(
+    q: str = Query(
+        ...,
+        min_length=2,
+        description="Drug name or fragment to search for",
+        example="warfrin"
+    ),
+    source: Literal["ddi", "barkla", "bnf"] = Query(
+        "ddi",
+        description="Data source to search: DDI table, Barkla table or BNF drug classes"
+    ),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)):
+    try:
+        # `%` (similarity above pg_trgm.similarity_threshold, 0.3 by default) can use the trigram
+        # GIN indexes; the name columns are cast to text to match the indexed expression. Each branch
+        # is DISTINCT as union() of a single select compiles to that select alone, without de-duplication
+        names = union(*[
+            select(cast(column, Text).label("name")).where(cast(column, Text).op("%")(q)).distinct()
+            for column in DRUG_NAME_SEARCH_COLUMNS[source]
+        ]).subquery()
+        drug_names = db.execute(
+            select(names.c.name).order_by(func.similarity(names.c.name, q).desc(), names.c.name).limit(limit)
+        ).scalars().all()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return drug_names
 
 # Get the set of side effect names
 @router.get("/side_effects_names", 
@@ -82,13 +125,15 @@ def get_faers_drug_names(db: Session = Depends(get_db)):
     response_description="A list of side effect names as strings.")
 def get_side_effect_names(db: Session = Depends(get_db)):
     try:
-        side_effects = [name[0] for name in db.query(SingleDrugPositiveControls.event_concept_name).distinct().all()]
-        side_effects = set(side_effects)
-        side_effects.discard(None)
-        hlgt = get_ancestor_side_effects(side_effects, db)
+        def load_side_effect_names():
+            side_effects = db.execute(
+                select(SingleDrugPositiveControls.event_concept_name).where(SingleDrugPositiveControls.event_concept_name.isnot(None)).distinct()
+            ).scalars().all()
+            return orjson.dumps(list(get_hlgt_ancestors(side_effects)))
+        content = names_region.get_or_create("side_effect_names", load_side_effect_names)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    return list(set(hlgt))
+    return Response(content=content, media_type="application/json")
 
 # Get the set of side effect names
 @router.get("/barkla_side_effects_names", 
@@ -97,13 +142,60 @@ def get_side_effect_names(db: Session = Depends(get_db)):
     response_description="A list of side effect names as strings.")
 def get_side_effect_names(db: Session = Depends(get_db)):
     try:
-        side_effects = [name[0] for name in db.query(BarklaData.side_effect).distinct().all()]
-        side_effects = set(side_effects)
-        side_effects.discard(None)
-        side_effects = sorted(side_effects)
+        content = names_region.get_or_create("barkla_side_effect_names", lambda: orjson.dumps(sorted(db.execute(
+            select(BarklaData.side_effect).where(BarklaData.side_effect.isnot(None)).distinct()
+        ).scalars().all())))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    return list(side_effects)
+    return Response(content=content, media_type="application/json")
+
+# JSON response for a cached body, tagged with an ETag derived from the body so clients can
+# revalidate with If-None-Match and get a 304 without the body. The body is needed to compare, so a
+# 304 saves the transfer; the query and encoding are only skipped when the body came from Redis
+# (with the null backend every revalidation still builds it). Weak, since GZipMiddleware may
+# re-encode the body.
+def etag_json_response(request: Request, content: bytes) -> Response:
+    etag = f'W/"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+    if_none_match = [tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")]
+    if etag.removeprefix("W/") in if_none_match or "*" in if_none_match:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=content, media_type="application/json", headers={"ETag": etag})
+
+# Execute a select() for streaming and return a generator over its row mappings. The generator is
+# advanced past the query here, before the response starts: query errors still reach the handler's
+# try/except as a 500 (once the 200 is sent an error can only truncate the body), and the session is
+# already inside the `with`, so it is closed when the generator is exhausted, closed or collected,
+# even if the client disconnects before the body starts. The generator owns its session because
+# FastAPI closes yield-dependencies before a streaming body is sent; yield_per uses a server-side
+# cursor so rows are encoded and sent in batches instead of being materialized first.
+def stream_rows(stmt):
+    def generate():
+        with SessionLocal() as db:
+            rows = db.execute(stmt.execution_options(yield_per=1000)).mappings()
+            yield
+            yield from rows
+
+    rows = generate()
+    next(rows)
+    return rows
+
+# Encode streamed rows as newline-delimited JSON
+def stream_ndjson(rows):
+    for row in rows:
+        yield orjson.dumps(dict(row)) + b"\n"
+
+# Encode streamed rows as a JSON array, one row at a time
+def stream_json_array(rows):
+    separator = b"["
+    for row in rows:
+        yield separator + orjson.dumps(dict(row))
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
+
+# Cache key for a list of drug names. The drug name columns are citext, so names are lower-cased
+# (as citext compares them) and de-duplicated; the query results are the same for any spelling.
+def drug_list_cache_key(drug_list: List[str]) -> Tuple[str, ...]:
+    return tuple(sorted({drug_name.lower() for drug_name in drug_list}))
 
 # Get the interactions for a set of drugs
 @router.get("/interactions", 
@@ -111,20 +203,62 @@ def get_side_effect_names(db: Session = Depends(get_db)):
     summary="Get drug-drug interactions for a list of drugs",
     response_description="List of drug-drug interactions with severity level")
 def get_interactions(
+    request: Request,
     drug_list: List[str] = Query(
         ..., 
         description="List of drug names to check for interactions",
         example=["aspirin", "warfarin"]
-    ), 
+    )):
+    drug_names = drug_list_cache_key(drug_list)
+    # The payload grows with the square of the list and large lists are rarely repeated, so stream
+    # them rather than building the whole body in memory (and in the cache)
+    try:
+        if len(drug_names) >= Config.STREAM_MIN_DRUGS:
+            rows = stream_rows(select_interactions(drug_names))
+            return StreamingResponse(stream_json_array(rows), media_type="application/json")
+        content = call_cached(get_interactions_json, drug_names)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return etag_json_response(request, content)
+
+# Stream the interactions for a set of drugs
+@router.get("/interactions_ndjson",
+    summary="Stream drug-drug interactions for a list of drugs as NDJSON",
+    description="Same rows as /interactions, streamed one JSON object per line for large drug lists.",
+    response_description="Newline-delimited JSON, one interaction per line.")
+def get_interactions_ndjson(
+    drug_list: List[str] = Query(
+        ..., 
+        description="List of drug names to check for interactions",
+        example=["aspirin", "warfarin"]
+    )):
+    try:
+        rows = stream_rows(select_interactions(drug_list))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return StreamingResponse(stream_ndjson(rows), media_type="application/x-ndjson")
+
+# Export every interaction involving a drug
+@router.get("/drug_interactions_export",
+    response_model=List[DDIResponse],
+    summary="Export all drug-drug interactions involving a drug",
+    description="The JSON array is built in Postgres (json_agg) and passed through without per-row work in Python.",
+    response_description="List of drug-drug interactions involving the drug.")
+def export_drug_interactions(
+    drug_name: str = Query(
+        ...,
+        description="Drug name to export interactions for",
+        example="warfarin"
+    ),
     db: Session = Depends(get_db)):
     try:
-        interactions = db.query(AllDrugDrugInteractions).filter(
-            AllDrugDrugInteractions.drug_a_concept_name.in_(drug_list),
-            AllDrugDrugInteractions.drug_b_concept_name.in_(drug_list)
-        ).all()
+        interactions = select(*DDI_RESPONSE_COLUMNS).where(
+            (DDIEnriched.drug_a_concept_name == drug_name) | (DDIEnriched.drug_b_concept_name == drug_name)
+        ).subquery()
+        content = db.execute(select_json_array(interactions.table_valued())).scalar_one()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    return interactions 
+    return Response(content=content, media_type="application/json")
 
 # Get the side effects for a set of drugs
 @router.get("/side_effects", 
@@ -133,21 +267,17 @@ def get_interactions(
     description="Retrieves side effects for the specified drugs from the database with BNF source.",
     response_description="List of side effects for the specified drugs.")
 def get_side_effects(
+    request: Request,
     drug_list: List[str] = Query(
         ..., 
         description="List of drug names to get side effects for",
         example=["aspirin"]
-    ), 
-    db: Session = Depends(get_db)):
+    )):
     try:
-        side_effects = db.query(SingleDrugPositiveControls).filter(
-            SingleDrugPositiveControls.drug_concept_name.in_(drug_list),
-            SingleDrugPositiveControls.source == 'BNF',
-            SingleDrugPositiveControls.frequency != 'Not reported (Interaction Effect)'
-        ).all()
+        content = call_cached(get_side_effects_json, drug_list_cache_key(drug_list))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    return side_effects
+    return etag_json_response(request, content)
 
 # Get indications for a given drug
 @router.get("/single_drug_indications", 
@@ -161,13 +291,9 @@ def get_single_drug_indications(
         ..., 
         description="Name of the drug to get indications for",
         example="aspirin"
-    ), 
-    db: Session = Depends(get_db)):
+    )):
     try:
-        indications = db.query(SiderDrugIndications).filter(
-            SiderDrugIndications.drug_concept_name == drug_name,
-            SiderDrugIndications.event_concept_name != 'Sudden death'
-        ).all()
+        indications = get_drug_indications(drug_name)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     return indications
@@ -183,22 +309,16 @@ def get_indications(
         ..., 
         description="List of drugs to get indications for",
         example=["aspirin", "omeprazole"]
-    ), 
-    db: Session = Depends(get_db)):
+    )):
     try:
-        indications = db.query(SiderDrugIndications).filter(
-            SiderDrugIndications.drug_concept_name.in_(drug_list),
-            SiderDrugIndications.event_concept_name != 'Sudden death'
-        ).all()
-        
         # Group indications by drug
         result = {}
-        for indication in indications:
-            if indication.drug_concept_name not in result:
-                result[indication.drug_concept_name] = []
-            result[indication.drug_concept_name].append(indication)
+        for indications in get_drugs_indications(drug_list).values():
+            for indication in indications:
+                result.setdefault(indication["drug_concept_name"], []).append(indication)
             
-        return result
+        # Plain dicts of strings; encode with orjson directly instead of through jsonable_encoder
+        return ORJSONResponse(content=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -224,7 +344,7 @@ def alternative_search(
     ), 
     db: Session = Depends(get_db)):
     try:
-        # Get drugs with matching indications
+        # Get distinct (drug, indication) pairs with matching indications
         subquery = db.query(
             SiderDrugIndications.drug_concept_name,
             SiderDrugIndications.event_concept_name
@@ -233,13 +353,14 @@ def alternative_search(
             SiderDrugIndications.event_concept_name != 'Sudden death',
             SiderDrugIndications.drug_concept_name != replaced_drug,
             SiderDrugIndications.drug_concept_name.isnot(None)
-        ).subquery()
+        ).distinct().subquery()
 
+        # Keep drugs that have every requested indication
         alternative_drugs = db.query(subquery.c.drug_concept_name).group_by(
             subquery.c.drug_concept_name
         ).having(
-            func.count(subquery.c.event_concept_name) == len(indication_list)
-        ).distinct().all()
+            func.count() == len(set(indication_list))
+        ).all()
         if alternative_drugs:
             alternative_drugs = [{"drug_concept_name": drug[0]} for drug in alternative_drugs]
         else:
@@ -250,6 +371,23 @@ def alternative_search(
 
     return alternative_drugs
 
+# Interactions between the replacement drug and each portfolio drug. Each (replacement_drug, drug)
+# pair is matched in either order via the (lo, hi) pair index; LEAST / GREATEST run in SQL on citext
+# so the ordering matches the generated columns. The statement has a fixed shape (the drug list is
+# one array parameter), so lambda_stmt caches its construction and compiled SQL across requests.
+def _alternative_interactions_stmt():
+    replacement = cast(bindparam("replacement_drug"), CITEXT)
+    drug = func.unnest(cast(bindparam("drug_list"), ARRAY(CITEXT()))).column_valued("drug")
+    return select(*DDI_RESPONSE_COLUMNS).where(
+        DDIEnriched.drug_pair_lo != bindparam("replaced_drug"),  # Ensure replaced_drug is excluded
+        DDIEnriched.drug_pair_hi != bindparam("replaced_drug"),
+        tuple_(DDIEnriched.drug_pair_lo, DDIEnriched.drug_pair_hi).in_(
+            select(func.least(replacement, drug), func.greatest(replacement, drug))
+        )
+    )
+
+ALTERNATIVE_INTERACTIONS_STMT = lambda_stmt(_alternative_interactions_stmt)
+
 # Get interactions for alternative drugs
 @router.get("/alternative_interactions", 
     response_model=List[DDIResponse],
@@ -274,22 +412,16 @@ def alternative_interactions(
     ), 
     db: Session = Depends(get_db)):
     try:
-        interactions = db.query(AllDrugDrugInteractions).filter(
-            (AllDrugDrugInteractions.drug_a_concept_name != replaced_drug) &  # Ensure replaced_drug is excluded
-            (AllDrugDrugInteractions.drug_b_concept_name != replaced_drug) &  
-            (
-                # Case 1: replacement_drug is drug_a, drug_b must be in drug_list
-                ((AllDrugDrugInteractions.drug_a_concept_name == replacement_drug) & 
-                 (AllDrugDrugInteractions.drug_b_concept_name.in_(drug_list))) |
-                # Case 2: replacement_drug is drug_b, drug_a must be in drug_list
-                ((AllDrugDrugInteractions.drug_b_concept_name == replacement_drug) & 
-                 (AllDrugDrugInteractions.drug_a_concept_name.in_(drug_list)))
-            )
-        ).all()
+        interactions = db.execute(ALTERNATIVE_INTERACTIONS_STMT, {
+            "replaced_drug": replaced_drug,
+            "replacement_drug": replacement_drug,
+            "drug_list": drug_list
+        }).mappings().all()
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    return interactions 
+    # Rows already have the DDIResponse shape; skip per-row model validation
+    return ORJSONResponse(content=[dict(interaction) for interaction in interactions])
 
     
 # Get ancestor concept names for a set of side effects
@@ -299,36 +431,15 @@ def alternative_interactions(
     # response_model=Dict[str, str]
 
     )
-def get_ancestor_side_effects(
+async def get_ancestor_side_effects(
     pt_list: List[str] = Query(
         ..., 
         description="List of side effects to get ancestor concept names for",
         example=["Headache", "Dizziness"]
-    ), 
-    db: Session = Depends(get_db)):
+    )):
     try:
-
-        # Fetch side effects for the given drug list
-        side_effects = db.query(PTtoHLTMapping).filter(
-            PTtoHLTMapping.descendant_concept_name.in_(pt_list)
-        ).all()
-        # Extract descendant concept names from side effects
-        descendant_names = [side_effect.descendant_concept_name for side_effect in side_effects]
-
-        ancestor_mappings = db.query(PTtoHLTMapping).filter(
-            PTtoHLTMapping.descendant_concept_name.in_(descendant_names),
-            PTtoHLTMapping.ancestor_concept_class_id == 'HLGT'
-        ).all()
-
-
-        # Prepare the result
-        result = {}
-        for mapping in ancestor_mappings:
-            if mapping.descendant_concept_name not in result:
-                result[mapping.descendant_concept_name] = []
-            result[mapping.descendant_concept_name].append(mapping.ancestor_concept_name)
-        for key, value in result.items():
-            result[key] = '/'.join(list(set(value)))
+        # Served from the PT -> HLGT map loaded at startup; no I/O, so the handler runs on the event loop
+        result = get_hlgt_ancestors(pt_list)
     except Exception as e:
         logger.error(f"Error in get_ancestor_side_effects: {str(e)}") 
         raise HTTPException(status_code=500, detail=str(e))
@@ -353,31 +464,17 @@ def get_culprit_drug(
     ), 
     db: Session = Depends(get_db)):
     try:
-        drug_list = [drug.lower() for drug in drug_list]
-        side_effect = side_effect.lower()
-
-        # Fetch rows from barkla data
-        barkla_data = db.query(BarklaData).filter(
-            BarklaData.side_effect == side_effect,
-            BarklaData.drug_name.in_(drug_list)
-        ).all()
-
-        # If there are no barkla data, return empty list
-        if not barkla_data:
-            return []
-
-        # If there are barkla data, calculate the total combined rate
-        total_combined_rate = sum(row.combined_rate for row in barkla_data)
-
-        # Calculate the score for each drug
-        for row in barkla_data:
-            row.score = row.combined_rate / total_combined_rate
-
-        #  Create a ranked list of drugs from most likely to least likely culprit
-        ranked_drugs = sorted(barkla_data, key=lambda x: x.score, reverse=True)
-        results = [{"drug_name": row.drug_name, "combined_rate": row.combined_rate, "score": row.score} for row in ranked_drugs]
-
-        return results
+        # Score each drug by its share of the total combined rate and rank from most likely to least
+        # likely culprit (NULLIF: a zero total leaves the scores NULL instead of dividing by zero)
+        score = (BarklaData.combined_rate / func.nullif(func.sum(BarklaData.combined_rate).over(), 0)).label("score")
+        ranked_drugs = db.execute(
+            select(BarklaData.drug_name, BarklaData.combined_rate, score).where(
+                BarklaData.side_effect == side_effect,
+                BarklaData.drug_name.in_(drug_list)
+            ).order_by(score.desc().nullslast())
+        ).mappings().all()
+
+        return [dict(row) for row in ranked_drugs]
 
     except Exception as e:
         logger.error(f"Error in get_culprit_drug: {str(e)}")
@@ -395,53 +492,31 @@ def get_most_likely_side_effect(
     ), 
     db: Session = Depends(get_db)):
     try:
-        drug_list = [drug.lower() for drug in drug_list]
-        # Barkla data for the patient's drugs and the specified side effect
-        barkla_data = db.query(BarklaData).with_entities(
-            BarklaData.drug_name,
+        # In one pass over the portfolio's rows: sum rates for the same side effects across the provided
+        # drugs (SUM over only NULL rates counts as 0) and rank the drugs contributing to each. Keeping
+        # both on the same row avoids matching separate results on the citext side effect's spelling.
+        side_effect_rates = select(
             BarklaData.side_effect,
-            BarklaData.combined_rate
-        ).filter(
-            BarklaData.drug_name.in_(drug_list)
-        ).all()
-
-        # If there are no barkla data, return empty list
-        if not barkla_data:
-            return []
-
-        barkla_data = pd.DataFrame(barkla_data)
-        barkla_data.columns = ['drug_name', 'side_effect', 'combined_rate']
-
-        # Sum rates for the same side effects across the provided drugs
-        side_effects_rates = barkla_data.groupby('side_effect').sum('combined_rate').reset_index()
-        side_effects_rates = side_effects_rates.rename(columns={'combined_rate': 'total_rate'})
-
-        #  Sort side effects by total rate
-        side_effects_rates = side_effects_rates.sort_values(by='total_rate', ascending=False)
-
-        #  Return the top 5 side effects
-        top_side_effects = side_effects_rates.head(10)
-        # top_side_effects = side_effects_rates
-
-        # Determine the drug most likely causing each of the top side effects
-        top_results = []
-        for _, row in top_side_effects.iterrows():
-            side_effect = row['side_effect']
-            total_rate = row['total_rate']
-
-            # Find the drug contributing most to this side effect
-            contributing_drug_data = barkla_data[barkla_data['side_effect'] == side_effect]
-            most_likely_drug = contributing_drug_data.loc[
-                contributing_drug_data['combined_rate'].idxmax(), 'drug_name'
-            ]
-
-            top_results.append({
-                'side_effect': side_effect,
-                'total_rate': total_rate,
-                'most_likely_drug': most_likely_drug
-            })
-            
-        return top_results
+            BarklaData.drug_name,
+            func.coalesce(func.sum(BarklaData.combined_rate).over(partition_by=BarklaData.side_effect), 0).label("total_rate"),
+            func.row_number().over(
+                partition_by=BarklaData.side_effect,
+                order_by=(BarklaData.combined_rate.desc().nullslast(), BarklaData.drug_name)
+            ).label("rank")
+        ).where(BarklaData.drug_name.in_(drug_list)).subquery()
+
+        # Keep the top 10 side effects, each with the drug contributing most to it
+        top_side_effects = db.execute(
+            select(
+                side_effect_rates.c.side_effect,
+                side_effect_rates.c.total_rate,
+                side_effect_rates.c.drug_name.label("most_likely_drug")
+            ).where(side_effect_rates.c.rank == 1).order_by(
+                side_effect_rates.c.total_rate.desc(), side_effect_rates.c.side_effect
+            ).limit(10)
+        ).mappings().all()
+
+        return [dict(row) for row in top_side_effects]
 
     except Exception as e:
         logger.error(f"Error in get_most_likely_side_effect: {str(e)}")
@@ -459,29 +534,31 @@ def get_most_likely_side_effect_faers(
     ), 
     db: Session = Depends(get_db)):
     try: 
-        drug_list = [drug.lower() for drug in drug_list]
-        faers_data = db.query(FAERSData).with_entities(
+        # Rank each drug's side effects by rate and keep the top 5 per drug
+        rank = func.row_number().over(
+            partition_by=FAERSData.drug_name,
+            order_by=FAERSData.rate.desc().nullslast()
+        ).label("rank")
+        ranked = select(
             FAERSData.drug_name,
             FAERSData.side_effect,
             FAERSData.drug_side_effect_occurrence_count,
             FAERSData.case_count_with_drug,
             FAERSData.rate,
-            FAERSData.wilson_interval
-        ).filter(
+            FAERSData.wilson_interval,
+            rank
+        ).where(
             FAERSData.drug_name.in_(drug_list)
-        ).all()
-
-        faers_data = pd.DataFrame(faers_data)
-        faers_data.columns = ['drug_name', 'side_effect', 'drug_side_effect_occurrence_count', 'case_count_with_drug', 'rate', 'wilson_interval']
-
-        #  Sort side effects by rate
-        faers_data = faers_data.sort_values(by=['drug_name', 'rate'], ascending=[True, False])
-
-        #  Return the top 5 side effects for each drug
-        top_results = faers_data.groupby('drug_name').head(5).reset_index(drop=True)
-        top_results = top_results.to_dict(orient='records')
+        ).subquery()
 
-        return top_results
+        # One JSON object per side effect (without the rank), aggregated in drug and rank order
+        top_result = func.json_build_object(*[
+            value for column in ranked.c if column.key != "rank" for value in (column.key, column)
+        ])
+        content = db.execute(
+            select_json_array(top_result, ranked.c.drug_name, ranked.c.rank).where(ranked.c.rank <= 5)
+        ).scalar_one()
+        return Response(content=content, media_type="application/json")
     
     except Exception as e:
         logger.error(f"Error in get_most_likely_side_effect_faers: {str(e)}")
@@ -491,24 +568,50 @@ def get_most_likely_side_effect_faers(
 @router.get("/drug_classes",
     summary="Get drug class for each drug in a list of drugs",
     response_description="List of dictionaries with drug names and their classes.")
-def get_drug_classes(
+async def get_drug_classes(
     drug_list: List[str] = Query(
         ..., 
         description="List of drugs to get drug classes for",
         example=["aspirin", "ibuprofen"]
-    ), 
-    db: Session = Depends(get_db)):
+    )):
     try:
-        # Convert input drug list to lowercase
-        drug_list = [drug.lower() for drug in drug_list]
-        
-        drug_classes = db.query(DrugClass).filter(
-            func.lower(DrugClass.drug_name).in_(drug_list)
-        ).all()
-        return drug_classes
+        # In-memory lookup (no I/O), so the handler runs on the event loop instead of a worker thread
+        drug_classes = {}
+        for drug_name in drug_list:
+            drug_class = get_drug_class(drug_name)
+            # drug_name is citext, so differently-cased inputs resolve to the same row
+            if drug_class:
+                drug_classes[drug_class["drug_name"]] = drug_class
+        return list(drug_classes.values())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# One JSON object per patient in the shape of PatientPortfolioResponse, built by Postgres from
+# patient_portfolio_mv (the age in whole years comes from AGE()). Patients without prescriptions have
+# a single row with NULL prescription columns, which the FILTER leaves out; missing text fields of a
+# prescription are returned as "".
+def select_patient_portfolios(*where):
+    prescription = func.json_build_object(
+        "start_date", PatientPortfolioMV.STARTDATE,
+        "end_date", PatientPortfolioMV.ENDDATE,
+        "drug", func.coalesce(PatientPortfolioMV.DRUG, ""),
+        "drug_name_generic", func.coalesce(PatientPortfolioMV.DRUG_NAME_GENERIC, ""),
+        "formulary_drug_cd", func.coalesce(PatientPortfolioMV.FORMULARY_DRUG_CD, ""),
+        "dose_val_rx", func.coalesce(PatientPortfolioMV.DOSE_VAL_RX, ""),
+        "dose_unit_rx", func.coalesce(PatientPortfolioMV.DOSE_UNIT_RX, ""),
+        "route", func.coalesce(PatientPortfolioMV.ROUTE, "")
+    )
+    portfolio = func.json_build_object(
+        "patient_id", PatientPortfolioMV.SUBJECT_ID,
+        "patient_gender", PatientPortfolioMV.GENDER,
+        "patient_age", cast(func.extract("year", func.age(PatientPortfolioMV.DOB)), Integer),
+        "patient_dob", PatientPortfolioMV.DOB,
+        "prescriptions", func.coalesce(func.json_agg(prescription).filter(PatientPortfolioMV.ROW_ID.isnot(None)), "[]")
+    )
+    return select(PatientPortfolioMV.SUBJECT_ID, portfolio.label("portfolio")).where(*where).group_by(
+        PatientPortfolioMV.SUBJECT_ID, PatientPortfolioMV.GENDER, PatientPortfolioMV.DOB
+    ).subquery()
+
 @router.get("/patient_portfolio_mimic",
     summary="Get patient portfolio for a given patient ID",
     response_description="List of dictionaries with drug names and their classes.")
@@ -516,55 +619,36 @@ def get_patient_portfolio_mimic(
     patient_id: str = Query(..., description="Patient ID to get portfolio for"),
     db: Session = Depends(get_db)):
     
-    # Query patient information
-    patient = db.query(Patient).filter(Patient.SUBJECT_ID == patient_id).first()
+    # The finished portfolio comes back from Postgres as JSON text and is passed through as is
+    portfolios = select_patient_portfolios(PatientPortfolioMV.SUBJECT_ID == patient_id)
+    content = db.execute(select(cast(portfolios.c.portfolio, Text))).scalar_one_or_none()
     
-    if not patient:
+    if content is None:
         raise HTTPException(status_code=404, detail=f"Patient with ID {patient_id} not found")
     
-    # Calculate age from DOB
-    dob = datetime.strptime(patient.DOB, "%Y-%m-%d %H:%M:%S")
-    age = (datetime.now() - dob).days // 365
-    
-    # Query patient prescriptions
-    prescriptions = db.query(
-        Prescription.STARTDATE,
-        Prescription.ENDDATE,
-        Prescription.DRUG,
-        Prescription.DRUG_NAME_GENERIC,
-        Prescription.FORMULARY_DRUG_CD,
-        Prescription.DOSE_VAL_RX,
-        Prescription.DOSE_UNIT_RX,
-        Prescription.ROUTE
-    ).filter(Prescription.SUBJECT_ID == patient_id).all()
-    
-    # Format prescriptions as per schema
-    prescription_list = []
-    for p in prescriptions:
-        # Handle potential None values by converting them to empty strings
-        prescription_list.append(
-            PrescriptionResponse(
-                start_date=str(p.STARTDATE) if p.STARTDATE else "",
-                end_date=str(p.ENDDATE) if p.ENDDATE else "",
-                drug=p.DRUG if p.DRUG else "",
-                drug_name_generic=p.DRUG_NAME_GENERIC if p.DRUG_NAME_GENERIC else "",
-                formulary_drug_cd=p.FORMULARY_DRUG_CD if p.FORMULARY_DRUG_CD else "",
-                dose_val_rx=p.DOSE_VAL_RX if p.DOSE_VAL_RX else "",
-                dose_unit_rx=p.DOSE_UNIT_RX if p.DOSE_UNIT_RX else "",
-                route=p.ROUTE if p.ROUTE else ""
-            )
-        )
-    
-    # Create response object
-    response = PatientPortfolioResponse(
-        patient_id=int(patient_id),
-        patient_gender=patient.GENDER,
-        patient_age=age,
-        patient_dob=str(patient.DOB),
-        prescriptions=prescription_list
-    )
-    
-    return response
+    return Response(content=content, media_type="application/json")
+
+@router.get("/patient_portfolios_mimic",
+    response_model=Dict[int, PatientPortfolioResponse],
+    summary="Get patient portfolios for a list of patient IDs",
+    description="""
+    Batched form of /patient_portfolio_mimic: fetches every requested portfolio in a single query.
+    Patients that are not found are omitted from the result.
+    """,
+    response_description="Dictionary of patient IDs and their portfolios.")
+def get_patient_portfolios_mimic(
+    patient_ids: List[int] = Query(..., description="Patient IDs to get portfolios for"),
+    db: Session = Depends(get_db)):
+    try:
+        # Portfolios keyed by patient ID, as one JSON object built by Postgres
+        portfolios = select_patient_portfolios(PatientPortfolioMV.SUBJECT_ID.in_(patient_ids))
+        content = db.execute(select(func.coalesce(
+            cast(func.json_object_agg(portfolios.c.SUBJECT_ID, portfolios.c.portfolio), Text), "{}"
+        ))).scalar_one()
+        return Response(content=content, media_type="application/json")
+    except Exception as e:
+        logger.error(f"Error in get_patient_portfolios_mimic: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/patient_diagnoses_mimic",
     summary="Get patient diagnoses for a given patient ID",
@@ -573,88 +657,128 @@ def get_patient_diagnoses_mimic(
     patient_id: str = Query(..., description="Patient ID to get diagnoses for"),
     db: Session = Depends(get_db)):
     try:
-        # Query patient information
-        patient = db.query(Patient).filter(Patient.SUBJECT_ID == patient_id).first()
+        # Patient, diagnoses and ICD9 titles in one query. Starting from the patient with LEFT JOINs
+        # tells an unknown patient (no rows) apart from one without diagnoses (NULL diagnosis columns)
+        rows = db.execute(
+            select(
+                Diagnosis.ROW_ID,
+                Diagnosis.ICD9_CODE,
+                Diagnosis.HADM_ID,
+                D_Icd.ICD9_CODE.label("TITLED_ICD9_CODE"),
+                D_Icd.SHORT_TITLE,
+                D_Icd.LONG_TITLE
+            ).select_from(Patient).outerjoin(
+                Diagnosis, Diagnosis.SUBJECT_ID == Patient.SUBJECT_ID
+            ).outerjoin(
+                D_Icd, D_Icd.ICD9_CODE == Diagnosis.ICD9_CODE
+            ).where(Patient.SUBJECT_ID == patient_id)
+        ).all()
         
-        if not patient:
+        if not rows:
             raise HTTPException(status_code=404, detail=f"Patient with ID {patient_id} not found")
         
-        # Query diagnoses with hadm_id
-        diagnoses = db.query(Diagnosis).filter(Diagnosis.SUBJECT_ID == patient_id).all()
+        # Group by ICD9 code with its titles and the hadm_ids it was diagnosed in
+        diagnoses = {}
+        for row in rows:
+            if row.ROW_ID is None:
+                continue
+            if row.ICD9_CODE not in diagnoses:
+                # First row for this code; if it has no titles in D_ICD, default them to "Unknown"
+                has_titles = row.TITLED_ICD9_CODE is not None
+                diagnoses[row.ICD9_CODE] = {
+                    "icd9_code": row.ICD9_CODE,
+                    "short_title": row.SHORT_TITLE if has_titles else "Unknown",
+                    "long_title": row.LONG_TITLE if has_titles else "Unknown",
+                    "hadm_ids": []
+                }
+            hadm_ids = diagnoses[row.ICD9_CODE]["hadm_ids"]
+            if row.HADM_ID and row.HADM_ID not in hadm_ids:
+                hadm_ids.append(row.HADM_ID)
         
-        # Get ICD9 codes from diagnoses
-        icd9_codes = [d.ICD9_CODE for d in diagnoses]
-            
-        # Get titles for each diagnosis code
-        diagnoses_with_titles = db.query(D_Icd).filter(D_Icd.ICD9_CODE.in_(icd9_codes)).all()
-        
-        # Create a mapping of ICD9 codes to their titles
-        icd9_to_titles = {d.ICD9_CODE: (d.SHORT_TITLE, d.LONG_TITLE) for d in diagnoses_with_titles}
-        
-        # Create a mapping of ICD9 codes to hadm_ids
-        icd9_to_hadm_ids = {}
-        for d in diagnoses:
-            if d.ICD9_CODE not in icd9_to_hadm_ids:
-                icd9_to_hadm_ids[d.ICD9_CODE] = []
-            if d.HADM_ID and d.HADM_ID not in icd9_to_hadm_ids[d.ICD9_CODE]:
-                icd9_to_hadm_ids[d.ICD9_CODE].append(d.HADM_ID)
-        
-        # Format diagnoses with titles and hadm_ids
-        diagnosis_list = []
-        for icd9_code in set(icd9_codes):  # Use set to get unique codes
-            # Get hadm_ids for this diagnosis
-            hadm_ids = icd9_to_hadm_ids.get(icd9_code, [])
-            
-            # If we have titles for this code, use them
-            if icd9_code in icd9_to_titles:
-                short_title, long_title = icd9_to_titles[icd9_code]
-                diagnosis_list.append({
-                    "icd9_code": icd9_code,
-                    "short_title": short_title,
-                    "long_title": long_title,
-                    "hadm_ids": hadm_ids
-                })
-            else:
-                # If no titles found, provide default values
-                diagnosis_list.append({
-                    "icd9_code": icd9_code,
-                    "short_title": "Unknown",
-                    "long_title": "Unknown",
-                    "hadm_ids": hadm_ids
-                })
-        
-        return diagnosis_list
+        return list(diagnoses.values())
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in get_patient_diagnoses_mimic: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
     
+# Build the admission details response for an admissions row
+def build_admission(admission: Admission) -> AdmissionResponse:
+    return AdmissionResponse(
+        hadm_id=admission.HADM_ID,
+        admission_time=admission.ADMITTIME,
+        discharge_time=admission.DISCHTIME,
+        diagnosis=admission.DIAGNOSIS if admission.DIAGNOSIS else ""
+    )
+
 @router.get("/admission_details",
     response_model=AdmissionResponse,
     summary="Get admission details for a given hospital admission ID",
+    description="For several admissions (e.g. the hadm_ids of /patient_diagnoses_mimic) prefer /admission_details_bulk.",
     response_description="Admission details including admission time, discharge time, and diagnosis.")
 def get_admission_details(
     hadm_id: int = Query(..., description="Hospital admission ID to get details for"),
     db: Session = Depends(get_db)):
     try:
-        # Query admission information
-        admission = db.query(Admission).filter(Admission.HADM_ID == hadm_id).first()
+        # Query admission information (primary key lookup, served from the session's identity map if already loaded)
+        admission = db.get(Admission, hadm_id)
         
         if not admission:
             raise HTTPException(status_code=404, detail=f"Admission with ID {hadm_id} not found")
         
-        # Create response object
-        response = AdmissionResponse(
-            hadm_id=admission.HADM_ID,
-            admission_time=str(admission.ADMITTIME) if admission.ADMITTIME else "",
-            discharge_time=str(admission.DISCHTIME) if admission.DISCHTIME else "",
-            diagnosis=admission.DIAGNOSIS if admission.DIAGNOSIS else ""
-        )
-        
-        return response
+        return build_admission(admission)
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in get_admission_details: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
-    
 
+@router.get("/admission_details_bulk",
+    response_model=Dict[int, AdmissionResponse],
+    summary="Get admission details for a list of hospital admission IDs",
+    description="""
+    Batched form of /admission_details: fetches every requested admission in a single query.
+    Admissions that are not found are omitted from the result.
+    """,
+    response_description="Dictionary of hospital admission IDs and their admission details.")
+def get_admission_details_bulk(
+    hadm_ids: List[int] = Query(..., description="Hospital admission IDs to get details for"),
+    db: Session = Depends(get_db)):
+    try:
+        admissions = db.query(Admission).filter(Admission.HADM_ID.in_(hadm_ids)).all()
+        return {admission.HADM_ID: build_admission(admission) for admission in admissions}
+    except Exception as e:
+        logger.error(f"Error in get_admission_details_bulk: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Admin endpoints change process state, so they require the X-Admin-Token header to match
+# ADMIN_TOKEN; they are disabled when no token is configured
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    if not Config.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), Config.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+admin_router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin_token)])
+
+# Flush the in-process caches, e.g. after the reference tables or materialized views are reloaded
+@admin_router.post("/cache/invalidate",
+    summary="Invalidate cached name lists, indications and responses in this process")
+def invalidate_cache():
+    invalidate_caches()
+    return {"message": "Caches invalidated."}
+
+# Reload the in-memory reference maps (drug classes, PT -> HLGT) after the tables change
+@admin_router.post("/reload_reference",
+    summary="Reload the reference tables held in memory by this process")
+def reload_reference():
+    try:
+        load_reference_tables()
+        # Cached name lists are derived from the PT -> HLGT map
+        invalidate_caches()
+    except Exception as e:
+        logger.error(f"Error in reload_reference: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"message": "Reference tables reloaded."}
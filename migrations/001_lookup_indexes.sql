@@ -0,0 +1,19 @@
+-- Indexes backing the filter columns of the DDI, Barkla, FAERS and MIMIC lookups.
+-- Mirrors the Index(...) declarations in app/db/models.py.
+--
+-- Apply with: psql "$DATABASE_URL" -f migrations/001_lookup_indexes.sql
+
+CREATE INDEX IF NOT EXISTS ix_ddi_drug_pair
+    ON drug_interaction_compendia_v2.all_drug_drug_interactions (drug_a_concept_name, drug_b_concept_name);
+CREATE INDEX IF NOT EXISTS ix_ddi_drug_b_a
+    ON drug_interaction_compendia_v2.all_drug_drug_interactions (drug_b_concept_name, drug_a_concept_name);
+
+CREATE INDEX IF NOT EXISTS ix_barkla_drug_se
+    ON drug_interaction_compendia_v2.barkla_weighted_rate (drug_name, side_effect);
+CREATE INDEX IF NOT EXISTS ix_faers_drug_se
+    ON drug_interaction_compendia_v2.faers_counts_2024 (drug_name, side_effect);
+
+CREATE INDEX IF NOT EXISTS ix_presc_subject
+    ON mimic_iii_clinical_database_1_4.prescriptions ("SUBJECT_ID");
+CREATE INDEX IF NOT EXISTS ix_diag_subject
+    ON mimic_iii_clinical_database_1_4.diagnoses ("SUBJECT_ID");
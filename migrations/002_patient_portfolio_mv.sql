@@ -0,0 +1,26 @@
+-- Pre-joined patient + prescription rows backing /patient_portfolio_mimic.
+-- LEFT JOIN so patients without prescriptions still resolve (with NULL prescription columns).
+-- MIMIC is static; refresh nightly with migrations/refresh_materialized_views.sql.
+--
+-- Apply with: psql "$DATABASE_URL" -f migrations/002_patient_portfolio_mv.sql
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS drug_interaction_compendia_v2.patient_portfolio_mv AS
+SELECT
+    p."SUBJECT_ID",
+    p."GENDER",
+    p."DOB",
+    rx."ROW_ID",
+    rx."STARTDATE",
+    rx."ENDDATE",
+    rx."DRUG",
+    rx."DRUG_NAME_GENERIC",
+    rx."FORMULARY_DRUG_CD",
+    rx."DOSE_VAL_RX",
+    rx."DOSE_UNIT_RX",
+    rx."ROUTE"
+FROM mimic_iii_clinical_database_1_4.patients p
+LEFT JOIN mimic_iii_clinical_database_1_4.prescriptions rx ON rx."SUBJECT_ID" = p."SUBJECT_ID";
+
+-- Required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS ux_patient_portfolio_mv
+    ON drug_interaction_compendia_v2.patient_portfolio_mv ("SUBJECT_ID", "ROW_ID");
@@ -0,0 +1,51 @@
+-- Drug-drug interactions pre-joined with the BNF class titles of both drugs and the
+-- MedDRA HLGT ancestors of the event, backing /interactions and /alternative_interactions.
+-- Class and HLGT lookups are collapsed to one row per key first so the LEFT JOINs never
+-- duplicate an interaction. Refresh with migrations/refresh_materialized_views.sql.
+--
+-- Apply with: psql "$DATABASE_URL" -f migrations/003_ddi_enriched_mv.sql
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS drug_interaction_compendia_v2.ddi_enriched_mv AS
+WITH drug_class AS (
+    SELECT DISTINCT ON (lower(drug_name)) lower(drug_name) AS drug_key, title
+    FROM drug_interaction_compendia_v2.bnf_drug_classes
+    ORDER BY lower(drug_name), drug_name
+),
+event_hlgt AS (
+    SELECT descendant_concept_name,
+           string_agg(DISTINCT ancestor_concept_name, '/' ORDER BY ancestor_concept_name) AS event_hlgt
+    FROM cdmv5.pt_to_hlt_or_hlgt
+    WHERE ancestor_concept_class_id = 'HLGT'
+    GROUP BY descendant_concept_name
+)
+SELECT
+    d.id,
+    d.drug_a_concept_name,
+    d.drug_b_concept_name,
+    d.event_concept_name,
+    d.drug_a_concept_id,
+    d.drug_b_concept_id,
+    d.event_concept_id,
+    d.drug_a_vocabulary_id,
+    d.drug_b_vocabulary_id,
+    d.severity_bnf,
+    d.severity_ansm,
+    d.severity_code,
+    d.evidence,
+    d.event_type,
+    d.description,
+    ca.title AS drug_a_class,
+    cb.title AS drug_b_class,
+    m.event_hlgt
+FROM drug_interaction_compendia_v2.all_drug_drug_interactions d
+LEFT JOIN drug_class ca ON ca.drug_key = lower(d.drug_a_concept_name)
+LEFT JOIN drug_class cb ON cb.drug_key = lower(d.drug_b_concept_name)
+LEFT JOIN event_hlgt m ON m.descendant_concept_name = d.event_concept_name;
+
+-- Required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS ux_ddi_enriched_mv_id
+    ON drug_interaction_compendia_v2.ddi_enriched_mv (id);
+CREATE INDEX IF NOT EXISTS ix_ddi_enriched_drug_pair
+    ON drug_interaction_compendia_v2.ddi_enriched_mv (drug_a_concept_name, drug_b_concept_name);
+CREATE INDEX IF NOT EXISTS ix_ddi_enriched_drug_b_a
+    ON drug_interaction_compendia_v2.ddi_enriched_mv (drug_b_concept_name, drug_a_concept_name);
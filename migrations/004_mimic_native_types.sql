@@ -0,0 +1,49 @@
+-- Store MIMIC dates/timestamps and NDC codes as native Postgres types instead of text/float.
+-- The ::text cast keeps the conversion valid whether or not a column was already converted.
+-- patient_portfolio_mv depends on converted columns, so it is dropped and rebuilt (as in 002).
+--
+-- Apply with: psql "$DATABASE_URL" -f migrations/004_mimic_native_types.sql
+
+BEGIN;
+
+DROP MATERIALIZED VIEW IF EXISTS drug_interaction_compendia_v2.patient_portfolio_mv;
+
+ALTER TABLE mimic_iii_clinical_database_1_4.patients
+    ALTER COLUMN "DOB" TYPE date USING NULLIF("DOB"::text, '')::date,
+    ALTER COLUMN "DOD" TYPE date USING NULLIF("DOD"::text, '')::date,
+    ALTER COLUMN "DOD_HOSP" TYPE date USING NULLIF("DOD_HOSP"::text, '')::date,
+    ALTER COLUMN "DOD_SSN" TYPE date USING NULLIF("DOD_SSN"::text, '')::date;
+
+ALTER TABLE mimic_iii_clinical_database_1_4.prescriptions
+    ALTER COLUMN "STARTDATE" TYPE date USING NULLIF("STARTDATE"::text, '')::date,
+    ALTER COLUMN "ENDDATE" TYPE date USING NULLIF("ENDDATE"::text, '')::date,
+    ALTER COLUMN "NDC" TYPE bigint USING "NDC"::bigint;
+
+ALTER TABLE mimic_iii_clinical_database_1_4.admissions
+    ALTER COLUMN "ADMITTIME" TYPE timestamp USING NULLIF("ADMITTIME"::text, '')::timestamp,
+    ALTER COLUMN "DISCHTIME" TYPE timestamp USING NULLIF("DISCHTIME"::text, '')::timestamp,
+    ALTER COLUMN "DEATHTIME" TYPE timestamp USING NULLIF("DEATHTIME"::text, '')::timestamp,
+    ALTER COLUMN "EDREGTIME" TYPE timestamp USING NULLIF("EDREGTIME"::text, '')::timestamp,
+    ALTER COLUMN "EDOUTTIME" TYPE timestamp USING NULLIF("EDOUTTIME"::text, '')::timestamp;
+
+CREATE MATERIALIZED VIEW drug_interaction_compendia_v2.patient_portfolio_mv AS
+SELECT
+    p."SUBJECT_ID",
+    p."GENDER",
+    p."DOB",
+    rx."ROW_ID",
+    rx."STARTDATE",
+    rx."ENDDATE",
+    rx."DRUG",
+    rx."DRUG_NAME_GENERIC",
+    rx."FORMULARY_DRUG_CD",
+    rx."DOSE_VAL_RX",
+    rx."DOSE_UNIT_RX",
+    rx."ROUTE"
+FROM mimic_iii_clinical_database_1_4.patients p
+LEFT JOIN mimic_iii_clinical_database_1_4.prescriptions rx ON rx."SUBJECT_ID" = p."SUBJECT_ID";
+
+CREATE UNIQUE INDEX ux_patient_portfolio_mv
+    ON drug_interaction_compendia_v2.patient_portfolio_mv ("SUBJECT_ID", "ROW_ID");
+
+COMMIT;
@@ -0,0 +1,80 @@
+-- Case-insensitive (citext) drug name and side effect columns, so lookups compare with plain
+-- equality / IN against the B-tree indexes instead of LOWER() expressions. Every drug name lookup
+-- (DDI, side effects, indications, Barkla, FAERS) is case-insensitive afterwards.
+-- bnf_drug_classes.drug_name stays text: it is the primary key and may hold names that differ only
+-- by case, which would fail a citext unique index. Drug classes are matched on lower(drug_name)
+-- instead, here and in the app's in-memory map (the first name by sort order wins).
+-- ddi_enriched_mv depends on the drug pair columns, so it is dropped and rebuilt (as in 003).
+--
+-- Apply with: psql "$DATABASE_URL" -f migrations/005_citext_drug_names.sql
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS citext;
+
+DROP MATERIALIZED VIEW IF EXISTS drug_interaction_compendia_v2.ddi_enriched_mv;
+
+ALTER TABLE drug_interaction_compendia_v2.all_drug_drug_interactions
+    ALTER COLUMN drug_a_concept_name TYPE citext,
+    ALTER COLUMN drug_b_concept_name TYPE citext;
+
+ALTER TABLE drug_interaction_compendia_v2.barkla_weighted_rate
+    ALTER COLUMN drug_name TYPE citext,
+    ALTER COLUMN side_effect TYPE citext;
+
+ALTER TABLE drug_interaction_compendia_v2.faers_counts_2024
+    ALTER COLUMN drug_name TYPE citext,
+    ALTER COLUMN side_effect TYPE citext;
+
+ALTER TABLE drug_interaction_compendia_v2.single_drug_positive_controls
+    ALTER COLUMN drug_concept_name TYPE citext;
+
+ALTER TABLE drug_interaction_compendia_v2.sider_drug_indications
+    ALTER COLUMN drug_concept_name TYPE citext;
+
+CREATE MATERIALIZED VIEW drug_interaction_compendia_v2.ddi_enriched_mv AS
+WITH drug_class AS (
+    SELECT DISTINCT ON (lower(drug_name)) lower(drug_name) AS drug_key, title
+    FROM drug_interaction_compendia_v2.bnf_drug_classes
+    ORDER BY lower(drug_name), drug_name
+),
+event_hlgt AS (
+    SELECT descendant_concept_name,
+           string_agg(DISTINCT ancestor_concept_name, '/' ORDER BY ancestor_concept_name) AS event_hlgt
+    FROM cdmv5.pt_to_hlt_or_hlgt
+    WHERE ancestor_concept_class_id = 'HLGT'
+    GROUP BY descendant_concept_name
+)
+SELECT
+    d.id,
+    d.drug_a_concept_name,
+    d.drug_b_concept_name,
+    d.event_concept_name,
+    d.drug_a_concept_id,
+    d.drug_b_concept_id,
+    d.event_concept_id,
+    d.drug_a_vocabulary_id,
+    d.drug_b_vocabulary_id,
+    d.severity_bnf,
+    d.severity_ansm,
+    d.severity_code,
+    d.evidence,
+    d.event_type,
+    d.description,
+    ca.title AS drug_a_class,
+    cb.title AS drug_b_class,
+    m.event_hlgt
+FROM drug_interaction_compendia_v2.all_drug_drug_interactions d
+LEFT JOIN drug_class ca ON ca.drug_key = lower(d.drug_a_concept_name)
+LEFT JOIN drug_class cb ON cb.drug_key = lower(d.drug_b_concept_name)
+LEFT JOIN event_hlgt m ON m.descendant_concept_name = d.event_concept_name;
+
+-- Required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX ux_ddi_enriched_mv_id
+    ON drug_interaction_compendia_v2.ddi_enriched_mv (id);
+CREATE INDEX ix_ddi_enriched_drug_pair
+    ON drug_interaction_compendia_v2.ddi_enriched_mv (drug_a_concept_name, drug_b_concept_name);
+CREATE INDEX ix_ddi_enriched_drug_b_a
+    ON drug_interaction_compendia_v2.ddi_enriched_mv (drug_b_concept_name, drug_a_concept_name);
+
+COMMIT;
@@ -0,0 +1,17 @@
+-- Trigram GIN indexes backing fuzzy drug name search (/drug_name_search).
+-- Most of the drug name columns are citext, which gin_trgm_ops does not accept, so the indexes are
+-- on the ::text cast (a no-op for bnf_drug_classes); queries must use the same expression. pg_trgm matching is case-insensitive.
+-- Mirrors the trigram Index(...) declarations in app/db/models.py.
+--
+-- Apply with: psql "$DATABASE_URL" -f migrations/006_trigram_drug_names.sql
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS ix_ddi_drug_a_trgm
+    ON drug_interaction_compendia_v2.all_drug_drug_interactions USING gin ((drug_a_concept_name::text) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_ddi_drug_b_trgm
+    ON drug_interaction_compendia_v2.all_drug_drug_interactions USING gin ((drug_b_concept_name::text) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_barkla_drug_trgm
+    ON drug_interaction_compendia_v2.barkla_weighted_rate USING gin ((drug_name::text) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_drug_class_trgm
+    ON drug_interaction_compendia_v2.bnf_drug_classes USING gin ((drug_name::text) gin_trgm_ops);
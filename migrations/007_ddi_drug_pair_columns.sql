@@ -0,0 +1,68 @@
+-- Order-independent drug pair columns: drug_pair_lo / drug_pair_hi hold LEAST / GREATEST of the two
+-- drug names, so an unordered pair is matched with a single (lo, hi) index lookup instead of
+-- checking both (a, b) and (b, a). Comparison follows citext (case-insensitive), as in 005.
+-- ddi_enriched_mv is rebuilt to carry the columns (as in 005).
+--
+-- Apply with: psql "$DATABASE_URL" -f migrations/007_ddi_drug_pair_columns.sql
+
+BEGIN;
+
+DROP MATERIALIZED VIEW IF EXISTS drug_interaction_compendia_v2.ddi_enriched_mv;
+
+ALTER TABLE drug_interaction_compendia_v2.all_drug_drug_interactions
+    ADD COLUMN drug_pair_lo citext GENERATED ALWAYS AS (LEAST(drug_a_concept_name, drug_b_concept_name)) STORED,
+    ADD COLUMN drug_pair_hi citext GENERATED ALWAYS AS (GREATEST(drug_a_concept_name, drug_b_concept_name)) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_ddi_drug_pair_lo_hi
+    ON drug_interaction_compendia_v2.all_drug_drug_interactions (drug_pair_lo, drug_pair_hi);
+
+CREATE MATERIALIZED VIEW drug_interaction_compendia_v2.ddi_enriched_mv AS
+WITH drug_class AS (
+    SELECT DISTINCT ON (lower(drug_name)) lower(drug_name) AS drug_key, title
+    FROM drug_interaction_compendia_v2.bnf_drug_classes
+    ORDER BY lower(drug_name), drug_name
+),
+event_hlgt AS (
+    SELECT descendant_concept_name,
+           string_agg(DISTINCT ancestor_concept_name, '/' ORDER BY ancestor_concept_name) AS event_hlgt
+    FROM cdmv5.pt_to_hlt_or_hlgt
+    WHERE ancestor_concept_class_id = 'HLGT'
+    GROUP BY descendant_concept_name
+)
+SELECT
+    d.id,
+    d.drug_a_concept_name,
+    d.drug_b_concept_name,
+    d.drug_pair_lo,
+    d.drug_pair_hi,
+    d.event_concept_name,
+    d.drug_a_concept_id,
+    d.drug_b_concept_id,
+    d.event_concept_id,
+    d.drug_a_vocabulary_id,
+    d.drug_b_vocabulary_id,
+    d.severity_bnf,
+    d.severity_ansm,
+    d.severity_code,
+    d.evidence,
+    d.event_type,
+    d.description,
+    ca.title AS drug_a_class,
+    cb.title AS drug_b_class,
+    m.event_hlgt
+FROM drug_interaction_compendia_v2.all_drug_drug_interactions d
+LEFT JOIN drug_class ca ON ca.drug_key = lower(d.drug_a_concept_name)
+LEFT JOIN drug_class cb ON cb.drug_key = lower(d.drug_b_concept_name)
+LEFT JOIN event_hlgt m ON m.descendant_concept_name = d.event_concept_name;
+
+-- Required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX ux_ddi_enriched_mv_id
+    ON drug_interaction_compendia_v2.ddi_enriched_mv (id);
+CREATE INDEX ix_ddi_enriched_drug_pair
+    ON drug_interaction_compendia_v2.ddi_enriched_mv (drug_a_concept_name, drug_b_concept_name);
+CREATE INDEX ix_ddi_enriched_drug_b_a
+    ON drug_interaction_compendia_v2.ddi_enriched_mv (drug_b_concept_name, drug_a_concept_name);
+CREATE INDEX ix_ddi_enriched_drug_pair_lo_hi
+    ON drug_interaction_compendia_v2.ddi_enriched_mv (drug_pair_lo, drug_pair_hi);
+
+COMMIT;
@@ -0,0 +1,20 @@
+-- Indexes for the lookups not covered by 001: /side_effects, the SIDER indication queries and
+-- the PT -> HLGT mapping. Built CONCURRENTLY so the tables stay writable; psql runs each statement
+-- in its own transaction, which CONCURRENTLY requires (do not wrap this file in BEGIN/COMMIT).
+-- Mirrors the Index(...) declarations in app/db/models.py.
+--
+-- Apply with: psql "$DATABASE_URL" -f migrations/008_remaining_lookup_indexes.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sdpc_source_drug
+    ON drug_interaction_compendia_v2.single_drug_positive_controls (source, drug_concept_name);
+
+-- Indication queries always exclude 'Sudden death'
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sider_drug
+    ON drug_interaction_compendia_v2.sider_drug_indications (drug_concept_name)
+    WHERE event_concept_name <> 'Sudden death';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sider_event_drug
+    ON drug_interaction_compendia_v2.sider_drug_indications (event_concept_name, drug_concept_name)
+    WHERE event_concept_name <> 'Sudden death';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_pt_descendant
+    ON cdmv5.pt_to_hlt_or_hlgt (descendant_concept_name) INCLUDE (ancestor_concept_name, ancestor_concept_class_id);
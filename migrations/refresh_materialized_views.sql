@@ -0,0 +1,7 @@
+-- Nightly refresh of the materialized views (e.g. from cron).
+-- CONCURRENTLY keeps the views readable while they rebuild.
+--
+-- Run with: psql "$DATABASE_URL" -f migrations/refresh_materialized_views.sql
+
+REFRESH MATERIALIZED VIEW CONCURRENTLY drug_interaction_compendia_v2.patient_portfolio_mv;
+REFRESH MATERIALIZED VIEW CONCURRENTLY drug_interaction_compendia_v2.ddi_enriched_mv;